@@ -5,84 +5,112 @@ TradingAgents-CN 依赖检查脚本
 """
 
 import sys
-import importlib
+from concurrent.futures import ThreadPoolExecutor
+from importlib.util import find_spec
 
-def check_module(module_name, description):
-    """检查模块是否可以导入"""
+# 核心依赖
+CORE_MODULES = [
+    ("streamlit", "Web界面框架"),
+    ("pandas", "数据处理"),
+    ("numpy", "数值计算"),
+    ("plotly", "图表显示")
+]
+
+# LangChain核心
+LANGCHAIN_MODULES = [
+    ("langchain", "LangChain主包"),
+    ("langchain_core", "LangChain核心"),
+    ("langchain_community", "LangChain社区包")
+]
+
+# LLM提供商
+LLM_PROVIDERS = [
+    ("langchain_openai", "OpenAI (GPT系列)"),
+    ("langchain_anthropic", "Anthropic (Claude系列)"),
+    ("langchain_google_genai", "Google AI (Gemini系列)"),
+    ("dashscope", "阿里百炼 (通义千问系列)")
+]
+
+# 数据库支持
+DB_MODULES = [
+    ("redis", "Redis缓存"),
+    ("pymongo", "MongoDB存储")
+]
+
+# 数据源
+DATA_MODULES = [
+    ("akshare", "AKShare数据源"),
+    ("yfinance", "Yahoo Finance"),
+    ("tushare", "Tushare数据源")
+]
+
+def probe_module(module_name):
+    """检查模块是否已安装（只解析模块规格，不执行模块初始化代码）
+
+    Returns:
+        (是否已安装, 错误信息)
+    """
     try:
-        importlib.import_module(module_name)
+        if find_spec(module_name) is not None:
+            return True, None
+        return False, "未安装"
+    except (ImportError, ValueError) as e:
+        return False, str(e)
+
+def probe_modules(module_names):
+    """并行检查多个模块，返回 {模块名: (是否已安装, 错误信息)}"""
+    module_names = list(module_names)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        return dict(zip(module_names, executor.map(probe_module, module_names)))
+
+def check_module(module_name, description, result=None):
+    """检查模块是否已安装并打印结果，result 为预先探测的结果"""
+    installed, error = result if result is not None else probe_module(module_name)
+    if installed:
         print(f"✅ {module_name} - {description}")
-        return True
-    except ImportError as e:
-        print(f"❌ {module_name} - {description} | 错误: {str(e)}")
-        return False
+    else:
+        print(f"❌ {module_name} - {description} | 错误: {error}")
+    return installed
 
 def main():
     print("🔍 TradingAgents-CN 依赖检查")
     print("=" * 60)
+
+    # 一次性并行探测所有模块，按原分组顺序打印
+    all_modules = CORE_MODULES + LANGCHAIN_MODULES + LLM_PROVIDERS + DB_MODULES + DATA_MODULES
+    probe_results = probe_modules(module for module, _ in all_modules)
     
     # 核心依赖
     print("\n📦 核心依赖:")
-    core_modules = [
-        ("streamlit", "Web界面框架"),
-        ("pandas", "数据处理"),
-        ("numpy", "数值计算"),
-        ("plotly", "图表显示")
-    ]
-    
     core_ok = True
-    for module, desc in core_modules:
-        if not check_module(module, desc):
+    for module, desc in CORE_MODULES:
+        if not check_module(module, desc, probe_results[module]):
             core_ok = False
     
     # LangChain核心
     print("\n🔗 LangChain 核心:")
-    langchain_modules = [
-        ("langchain", "LangChain主包"),
-        ("langchain_core", "LangChain核心"),
-        ("langchain_community", "LangChain社区包")
-    ]
-    
     langchain_ok = True
-    for module, desc in langchain_modules:
-        if not check_module(module, desc):
+    for module, desc in LANGCHAIN_MODULES:
+        if not check_module(module, desc, probe_results[module]):
             langchain_ok = False
     
     # LLM提供商
     print("\n🤖 LLM 提供商支持:")
-    llm_providers = [
-        ("langchain_openai", "OpenAI (GPT系列)"),
-        ("langchain_anthropic", "Anthropic (Claude系列)"),
-        ("langchain_google_genai", "Google AI (Gemini系列)"),
-        ("dashscope", "阿里百炼 (通义千问系列)")
-    ]
-    
     provider_results = {}
-    for module, desc in llm_providers:
-        provider_results[module] = check_module(module, desc)
+    for module, desc in LLM_PROVIDERS:
+        provider_results[module] = check_module(module, desc, probe_results[module])
     
     # 数据库支持
     print("\n🗄️ 数据库支持:")
-    db_modules = [
-        ("redis", "Redis缓存"),
-        ("pymongo", "MongoDB存储")
-    ]
-    
     db_ok = True
-    for module, desc in db_modules:
-        if not check_module(module, desc):
+    for module, desc in DB_MODULES:
+        if not check_module(module, desc, probe_results[module]):
             db_ok = False
     
     # 数据源
     print("\n📊 数据源支持:")
-    data_modules = [
-        ("akshare", "AKShare数据源"),
-        ("yfinance", "Yahoo Finance"),
-        ("tushare", "Tushare数据源")
-    ]
-    
-    for module, desc in data_modules:
-        check_module(module, desc)
+    for module, desc in DATA_MODULES:
+        check_module(module, desc, probe_results[module])
     
     # 总结
     print("\n" + "=" * 60)
@@ -4,15 +4,42 @@ TradingAgents-CN 增强启动脚本
 自动检查并安装缺失的依赖包
 """
 
+import ipaddress
 import os
+import socket
 import sys
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from importlib.util import find_spec
 from pathlib import Path
 
 def check_virtual_env():
     """检查是否在虚拟环境中运行"""
     return hasattr(sys, 'real_prefix') or (hasattr(sys, 'base_prefix') and sys.base_prefix != sys.prefix)
 
+def get_local_ip():
+    """获取本机内网IP（通过UDP套接字路由查询，不实际发送数据）"""
+    try:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            sock.connect(("8.8.8.8", 80))
+            return sock.getsockname()[0]
+        finally:
+            sock.close()
+    except OSError:
+        pass
+
+    # 无默认路由时，退回到主机名解析结果中的私有地址
+    try:
+        for info in socket.getaddrinfo(socket.gethostname(), None, socket.AF_INET):
+            ip = info[4][0]
+            address = ipaddress.ip_address(ip)
+            if address.is_private and not address.is_loopback:
+                return ip
+    except OSError:
+        pass
+    return None
+
 def install_package(package_name):
     """安装Python包"""
     try:
@@ -25,6 +52,28 @@ def install_package(package_name):
         print(f"❌ {package_name} 安装失败: {e.stderr}")
         return False
 
+def install_packages(package_names):
+    """一次性安装多个Python包，返回安装失败的包列表"""
+    print(f"🔄 正在安装 {' '.join(package_names)}...")
+    result = subprocess.run(
+        [sys.executable, "-m", "pip", "install", "--disable-pip-version-check", *package_names],
+        capture_output=True, text=True
+    )
+    if result.returncode == 0:
+        print(f"✅ {len(package_names)} 个依赖包安装成功")
+        return []
+
+    # 批量安装失败时逐个重试，定位具体出错的包
+    print("⚠️ 批量安装失败，逐个重试以定位问题包...")
+    return [package for package in package_names if not install_package(package)]
+
+def _probe_package(package):
+    """检查包是否已安装（只解析模块规格，不执行模块初始化代码），返回 (包名, 是否可用)"""
+    try:
+        return package, find_spec(package.replace("-", "_")) is not None
+    except (ImportError, ValueError):
+        return package, False
+
 def check_and_install_dependencies():
     """检查并安装依赖包"""
     print("🔍 检查依赖包...")
@@ -53,34 +102,38 @@ def check_and_install_dependencies():
         "pymongo"
     ]
     
+    # 缺失时的提示信息；数据库依赖为可选功能，不计入缺失列表
+    missing_messages = {
+        "core": "缺失",
+        "llm": "缺失 (LLM支持)",
+        "db": "缺失 (可选功能)"
+    }
+    missing_icons = {"core": "❌", "llm": "⚠️", "db": "📝"}
+
+    all_packages = (
+        [(package, "core") for package in core_dependencies]
+        + [(package, "llm") for package in llm_dependencies]
+        + [(package, "db") for package in db_dependencies]
+    )
+
+    # 已经加载到 sys.modules 的包无需再查找
+    loaded_modules = frozenset(sys.modules)
+    packages_to_probe = [package for package, _ in all_packages
+                         if package.replace("-", "_") not in loaded_modules]
+
+    # 并行探测其余依赖（查找过程中的磁盘I/O可以互相重叠），按原顺序输出
+    with ThreadPoolExecutor(max_workers=max(1, min(8, len(packages_to_probe)))) as executor:
+        probe_results = dict(executor.map(_probe_package, packages_to_probe))
+
     missing_packages = []
-    
-    # 检查核心依赖
-    for package in core_dependencies:
-        try:
-            __import__(package.replace("-", "_"))
+    for package, category in all_packages:
+        if probe_results.get(package, True):
             print(f"✅ {package}")
-        except ImportError:
-            print(f"❌ {package} 缺失")
+            continue
+        print(f"{missing_icons[category]} {package} {missing_messages[category]}")
+        if category != "db":
             missing_packages.append(package)
     
-    # 检查LLM依赖
-    for package in llm_dependencies:
-        try:
-            __import__(package.replace("-", "_"))
-            print(f"✅ {package}")
-        except ImportError:
-            print(f"⚠️ {package} 缺失 (LLM支持)")
-            missing_packages.append(package)
-    
-    # 检查数据库依赖（可选）
-    for package in db_dependencies:
-        try:
-            __import__(package)
-            print(f"✅ {package}")
-        except ImportError:
-            print(f"📝 {package} 缺失 (可选功能)")
-    
     # 安装缺失的包
     if missing_packages:
         print(f"\n🛠️ 发现 {len(missing_packages)} 个缺失的依赖包")
@@ -93,10 +146,7 @@ def check_and_install_dependencies():
             if response.lower() != 'y':
                 return False
         
-        failed_packages = []
-        for package in missing_packages:
-            if not install_package(package):
-                failed_packages.append(package)
+        failed_packages = install_packages(missing_packages)
         
         if failed_packages:
             print(f"\n❌ 以下包安装失败: {', '.join(failed_packages)}")
@@ -108,6 +158,15 @@ def check_and_install_dependencies():
     
     return True
 
+def precompile_modules(project_root):
+    """预编译Web应用及其依赖的项目模块，首次访问页面时无需再编译源码"""
+    if sys.dont_write_bytecode:
+        return
+
+    import compileall
+    for package_dir in ("web", "tradingagents"):
+        compileall.compile_dir(str(project_root / package_dir), quiet=1, workers=0)
+
 def main():
     """主函数"""
     print("🚀 TradingAgents-CN 增强启动器")
@@ -137,6 +196,12 @@ def main():
         print(f"❌ 找不到应用文件: {app_file}")
         return
     
+    # 预编译字节码
+    try:
+        precompile_modules(project_root)
+    except Exception as e:
+        print(f"⚠️ 预编译字节码失败，跳过: {e}")
+
     # 设置环境变量
     env = os.environ.copy()
     current_path = env.get('PYTHONPATH', '')
@@ -158,12 +223,20 @@ def main():
     print("\n🌐 启动Web应用...")
     print("📱 可以通过以下地址访问:")
     print("   - 本地访问: http://localhost:8501")
-    print("   - 内网访问: http://10.1.29.13:8501")
+    local_ip = get_local_ip()
+    if local_ip:
+        print(f"   - 内网访问: http://{local_ip}:8501")
     print("⏹️  按 Ctrl+C 停止应用")
     print("=" * 50)
     
     try:
-        subprocess.run(cmd, cwd=project_root, env=env)
+        if os.name == 'nt':
+            subprocess.run(cmd, cwd=project_root, env=env)
+        else:
+            # 用Streamlit进程直接替换当前进程，不再保留一个空等的父进程
+            sys.stdout.flush()
+            os.chdir(project_root)
+            os.execve(cmd[0], cmd, env)
     except KeyboardInterrupt:
         print("\n⏹️ Web应用已停止")
     except Exception as e:
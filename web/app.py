@@ -7,8 +7,8 @@ TradingAgents-CN Web应用主入口
 import streamlit as st
 import sys
 import os
+import importlib
 from pathlib import Path
-import threading
 import uuid
 import time
 
@@ -19,28 +19,46 @@ sys.path.insert(0, str(project_root))
 # 导入页面组件
 from web.components.header import render_header
 from web.components.sidebar import render_sidebar
-from web.components.analysis_form import render_analysis_form
-from web.components.results_display import render_results
 from web.components.async_progress_display import display_unified_progress
 from web.utils.ui_utils import apply_hide_deploy_button_css, apply_common_styles
 
 # 导入工具模块
-from web.utils.analysis_runner import run_stock_analysis, format_analysis_results
+from web.utils.analysis_runner import run_stock_analysis
 from web.utils.async_progress_tracker import AsyncProgressTracker
-from web.utils.thread_tracker import register_analysis_thread
+from web.utils.thread_tracker import (
+    submit_analysis, cancel_analysis, is_analysis_cancelled, AnalysisCancelledError
+)
 from web.utils.file_session_manager import get_persistent_analysis_id, set_persistent_analysis_id
 
-# 导入页面模块
-from web.modules.analysis_history import render_analysis_history
-from web.modules.token_statistics import render_token_statistics
-from web.modules.config_management import render_config_management
-from web.modules.cache_management import main as render_cache_management
+# 页面模块按需导入（页面名称 -> (模块路径, 渲染函数名)），
+# 避免在默认的股票分析页面上为其他页面的依赖付出导入开销
+LAZY_PAGES = {
+    "📈 历史记录": ("web.modules.analysis_history", "render_analysis_history"),
+    "💰 Token统计": ("web.modules.token_statistics", "render_token_statistics"),
+    "⚙️ 配置管理": ("web.modules.config_management", "render_config_management"),
+    "💾 缓存管理": ("web.modules.cache_management", "main")
+}
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
 logger = get_logger('web')
 
 
+def load_page_renderer(page_name):
+    """导入并返回页面的渲染函数"""
+    module_path, attr = LAZY_PAGES[page_name]
+    return getattr(importlib.import_module(module_path), attr)
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def get_api_status():
+    """检查API密钥配置状态（缓存60秒，避免每次重跑都读取环境变量）"""
+    return {
+        'dashscope': bool(os.getenv("DASHSCOPE_API_KEY")),
+        'finnhub': bool(os.getenv("FINNHUB_API_KEY"))
+    }
+
+
 def setup_page_config():
     """配置页面基本设置"""
     st.set_page_config(
@@ -98,6 +116,9 @@ def run_analysis_in_background(stock_symbol, analysis_date, analysts, research_d
         
         # 创建进度回调函数
         def progress_callback(message, step=None, total_steps=None):
+            # 用户点击停止分析后，在下一次进度更新时中止分析
+            if is_analysis_cancelled(analysis_id):
+                raise AnalysisCancelledError("用户已停止分析")
             try:
                 tracker.update_progress(message, step)
             except Exception as e:
@@ -124,6 +145,12 @@ def run_analysis_in_background(stock_symbol, analysis_date, analysts, research_d
             tracker.mark_failed(error_msg)
             logger.error(f"❌ [后台分析] 分析失败: {stock_symbol} ({analysis_id}), 错误: {error_msg}")
             
+    except AnalysisCancelledError as e:
+        logger.info(f"⏹️ [后台分析] 分析已停止: {stock_symbol} ({analysis_id})")
+        try:
+            tracker.mark_failed(str(e))
+        except:
+            pass
     except Exception as e:
         logger.error(f"❌ [后台分析] 异常: {e}", exc_info=True)
         try:
@@ -144,6 +171,8 @@ def render_stock_analysis_page():
         # 检查是否需要显示分析结果
         if st.session_state.get('show_analysis_results') and st.session_state.get('analysis_results'):
             st.header("📊 分析结果")
+            # 结果展示依赖plotly/pandas，仅在真正渲染报告时导入
+            from web.components.results_display import render_results
             render_results(st.session_state.analysis_results)
             
             # 添加返回按钮
@@ -155,6 +184,7 @@ def render_stock_analysis_page():
             # 显示分析表单和进度
             if not st.session_state.get('analysis_running'):
                 # 显示分析表单
+                from web.components.analysis_form import render_analysis_form
                 form_data = render_analysis_form()
                 
                 # 检查表单是否成功提交并包含必要数据
@@ -181,28 +211,21 @@ def render_stock_analysis_page():
                     llm_provider = st.session_state.get('llm_provider', 'dashscope')
                     llm_model = st.session_state.get('llm_model', 'qwen-plus')
                     
-                    # 创建并启动后台分析线程
-                    analysis_thread = threading.Thread(
-                        target=run_analysis_in_background,
-                        args=(
-                            form_data['stock_symbol'],
-                            form_data['analysis_date'], 
-                            form_data['analysts'],
-                            form_data['research_depth'],
-                            llm_provider,
-                            llm_model,
-                            form_data['market_type'],
-                            analysis_id
-                        ),
-                        name=f"Analysis-{analysis_id}",
-                        daemon=True
+                    # 提交到共享分析线程池（注册到跟踪器）
+                    submit_analysis(
+                        analysis_id,
+                        run_analysis_in_background,
+                        form_data['stock_symbol'],
+                        form_data['analysis_date'], 
+                        form_data['analysts'],
+                        form_data['research_depth'],
+                        llm_provider,
+                        llm_model,
+                        form_data['market_type'],
+                        analysis_id
                     )
                     
-                    # 注册线程到跟踪器
-                    register_analysis_thread(analysis_id, analysis_thread)
-                    analysis_thread.start()
-                    
-                    logger.info(f"🚀 [分析启动] 后台线程已启动: {analysis_id}")
+                    logger.info(f"🚀 [分析启动] 后台任务已提交: {analysis_id}")
                     st.rerun()
             else:
                 # 显示分析进度
@@ -222,6 +245,8 @@ def render_stock_analysis_page():
                         
                     # 添加停止分析按钮
                     if st.button("⏹️ 停止分析", type="secondary"):
+                        # 排队中的分析直接取消，运行中的分析在下一次进度更新时停止
+                        cancel_analysis(st.session_state.current_analysis_id)
                         st.session_state.analysis_running = False
                         st.session_state.current_analysis_id = None
                         st.rerun()
@@ -269,9 +294,9 @@ def render_stock_analysis_page():
         st.markdown("### 🔧 系统状态")
         
         # 检查API配置状态
-        import os
-        dashscope_configured = bool(os.getenv("DASHSCOPE_API_KEY"))
-        finnhub_configured = bool(os.getenv("FINNHUB_API_KEY"))
+        api_status = get_api_status()
+        dashscope_configured = api_status['dashscope']
+        finnhub_configured = api_status['finnhub']
         
         st.markdown(f"**API配置状态:**")
         st.markdown(f"- 阿里百炼: {'✅ 已配置' if dashscope_configured else '❌ 未配置'}")
@@ -298,25 +323,22 @@ def main():
         st.session_state.llm_model = sidebar_config['llm_model']
     
     # 页面导航
-    page_options = {
-        "📊 股票分析": render_stock_analysis_page,
-        "📈 历史记录": render_analysis_history,
-        "💰 Token统计": render_token_statistics,
-        "⚙️ 配置管理": render_config_management,
-        "💾 缓存管理": render_cache_management
-    }
+    page_names = ["📊 股票分析", *LAZY_PAGES]
     
     # 创建页面标签
     selected_page = st.selectbox(
         "选择功能页面",
-        options=list(page_options.keys()),
+        options=page_names,
         index=0,
         help="选择要使用的功能模块"
     )
     
-    # 渲染选中的页面
+    # 渲染选中的页面（其他页面模块仅在被选中时导入）
     try:
-        page_options[selected_page]()
+        if selected_page == "📊 股票分析":
+            render_stock_analysis_page()
+        else:
+            load_page_renderer(selected_page)()
     except Exception as e:
         st.error(f"❌ 页面加载失败: {e}")
         logger.error(f"页面加载失败: {selected_page}, 错误: {e}", exc_info=True)
@@ -5,8 +5,11 @@
 
 import streamlit as st
 import pandas as pd
-from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from collections import Counter
+from datetime import date, datetime, time as dt_time, timedelta
+from typing import List, Dict, Any, Iterable, Optional, Union
+import glob
+import os
 import sys
 from pathlib import Path
 
@@ -14,12 +17,89 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
-from web.utils.async_progress_tracker import get_all_analysis_history, get_progress_by_id
+# Redis为可选依赖，未安装时只清理文件记录
+try:
+    import redis
+except ImportError:
+    redis = None
+
+from web.utils.async_progress_tracker import get_all_analysis_history, get_progress_by_id, get_redis_client
 from web.utils.analysis_runner import format_analysis_results
 from tradingagents.utils.logging_manager import get_logger
 
 logger = get_logger('analysis_history')
 
+# 研究深度的文本描述
+_DEPTH_MAP = {1: "快速分析", 2: "标准分析", 3: "深度分析"}
+
+# 历史记录表格的列：记录字段 -> 表头
+_TABLE_COLUMNS = {
+    'stock_symbol': "股票代码",
+    'market_type': "市场",
+    '_status_display': "状态",
+    '_progress_display': "进度",
+    'start_time_formatted': "开始时间",
+    'duration_formatted': "耗时",
+    'analysts': "分析师",
+    'research_depth': "研究深度",
+}
+
+# 记录数不超过该值时用Markdown表格显示，不构建DataFrame
+_SMALL_TABLE_ROWS = 20
+
+# 状态筛选选项对应的记录状态
+_STATUS_FILTER_MAP = {"已完成": "completed", "运行中": "running", "失败": "failed"}
+
+# 时间筛选选项对应的回溯时长（"今天"按当天零点计算）
+_TIME_CUTOFFS = {"最近7天": timedelta(days=7), "最近30天": timedelta(days=30)}
+
+
+def _get_redis_client():
+    """获取共享连接池的Redis客户端，Redis未安装或未启用时返回None"""
+    if redis is None or os.getenv('REDIS_ENABLED', 'false').lower() != 'true':
+        return None
+    return get_redis_client()
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_history(limit: int) -> List[Dict[str, Any]]:
+    """缓存历史记录列表，筛选控件变化引起的重跑不再重复读取Redis/文件"""
+    return [_decorate(record) for record in get_all_analysis_history(limit=limit)]
+
+
+def _decorate(record: Dict[str, Any]) -> Dict[str, Any]:
+    """预先生成记录的显示文本，随历史记录一起缓存，渲染时直接使用"""
+    status_display = f"{record.get('status_icon', '❓')} {record.get('status_text', '未知')}"
+    option_label = (f"{record.get('stock_symbol', '未知')} - {record.get('status_text', '未知')} - "
+                    f"{record.get('last_update_formatted', '未知')}")
+    return {
+        **record,
+        '_status_display': status_display,
+        '_progress_display': f"{record.get('progress_percentage', 0):.1f}%",
+        '_option_label': option_label,
+    }
+
+
+@st.cache_data(ttl=10, show_spinner=False)
+def _cached_progress(analysis_id: str) -> Optional[Dict[str, Any]]:
+    """缓存单条记录的进度数据，切换面板或控件时不再重复读取"""
+    return get_progress_by_id(analysis_id)
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _cached_final_progress(analysis_id: str) -> Optional[Dict[str, Any]]:
+    """已结束（完成或失败）的分析数据不再变化，使用更长的缓存时间"""
+    return get_progress_by_id(analysis_id)
+
+
+def _load_progress(analysis_id: str, status: Optional[str]) -> Optional[Dict[str, Any]]:
+    """按分析状态选择缓存策略读取进度数据，运行中的分析直接读取以保证实时性"""
+    if status == 'running':
+        return get_progress_by_id(analysis_id)
+    if status in ('completed', 'failed'):
+        return _cached_final_progress(analysis_id)
+    return _cached_progress(analysis_id)
+
 
 def render_analysis_history():
     """渲染分析历史记录页面"""
@@ -53,17 +133,24 @@ def render_analysis_history():
     
     with col4:
         if st.button("🔄 刷新", help="刷新历史记录列表"):
+            _cached_history.clear()
             st.rerun()
 
     # 获取历史记录
     with st.spinner("📊 正在获取历史记录..."):
         try:
-            history_records = get_all_analysis_history(limit=record_limit)
+            history_records = _cached_history(record_limit)
         except Exception as e:
             st.error(f"❌ 获取历史记录失败: {e}")
-            logger.error(f"获取历史记录失败: {e}")
+            logger.error("获取历史记录失败: %s", e)
             return
 
+    # 刚删除记录后的重跑：提示删除结果，并确保已删除的记录不再显示
+    deleted_id = st.session_state.pop('_hist_deleted_id', None)
+    if deleted_id:
+        st.success(f"✅ 已删除分析记录 `{deleted_id}`")
+        history_records = [r for r in history_records if r.get('analysis_id') != deleted_id]
+
     if not history_records:
         st.info("📝 暂无历史记录。开始您的第一个股票分析吧！")
         if st.button("🚀 开始分析", type="primary"):
@@ -82,42 +169,50 @@ def render_analysis_history():
     
     st.markdown("---")
     
-    # 显示历史记录列表
-    display_history_table(filtered_records)
+    # 显示历史记录列表；收起时跳过表格构建，调整筛选条件时重跑更快
+    fingerprint = _records_fingerprint(filtered_records)
+    if st.checkbox("📋 显示历史记录列表", value=True, key="_hist_expanded"):
+        display_history_table(filtered_records, fingerprint)
+    
+    st.markdown("---")
+    
+    # 显示操作按钮区域
+    display_action_buttons(filtered_records, fingerprint)
+
 
+def _time_cutoff(time_filter: str) -> float:
+    """返回时间筛选对应的最早更新时间戳，"全部"或未知选项返回0"""
+    if time_filter in _TIME_CUTOFFS:
+        return (datetime.now() - _TIME_CUTOFFS[time_filter]).timestamp()
+    if time_filter == "今天":
+        return datetime.combine(date.today(), dt_time.min).timestamp()
+    return 0
 
-def apply_filters(records: List[Dict], status_filter: str, time_filter: str) -> List[Dict]:
-    """应用筛选条件"""
-    filtered = records.copy()
+
+def apply_filters(records: List[Dict], status_filter: Union[str, Iterable[str]], time_filter: str) -> List[Dict]:
+    """
+    应用筛选条件（状态和时间条件在一次遍历中完成）
+    status_filter可以是单个选项，也可以是多个选项（多选）
+    """
+    status_filters = (status_filter,) if isinstance(status_filter, str) else tuple(status_filter)
     
-    # 状态筛选
-    if status_filter != "全部":
-        status_map = {
-            "已完成": "completed",
-            "运行中": "running", 
-            "失败": "failed"
-        }
-        target_status = status_map.get(status_filter)
-        if target_status:
-            filtered = [r for r in filtered if r.get('status') == target_status]
+    # 默认不筛选时直接返回原列表
+    if (not status_filters or "全部" in status_filters) and time_filter == "全部":
+        return records
     
-    # 时间筛选
-    if time_filter != "全部":
-        now = datetime.now()
-        
-        if time_filter == "今天":
-            start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
-            cutoff_timestamp = start_of_day.timestamp()
-        elif time_filter == "最近7天":
-            cutoff_timestamp = (now - timedelta(days=7)).timestamp()
-        elif time_filter == "最近30天":
-            cutoff_timestamp = (now - timedelta(days=30)).timestamp()
-        else:
-            cutoff_timestamp = 0
-        
-        filtered = [r for r in filtered if r.get('last_update', 0) >= cutoff_timestamp]
+    # 状态筛选：选项转换为状态集合，每条记录只做一次集合查找
+    target_statuses = None
+    if status_filters and "全部" not in status_filters:
+        target_statuses = frozenset(_STATUS_FILTER_MAP[f] for f in status_filters if f in _STATUS_FILTER_MAP) or None
+    
+    # 时间筛选（截止时间只计算一次）
+    cutoff_timestamp = _time_cutoff(time_filter)
     
-    return filtered
+    return [
+        r for r in records
+        if (target_statuses is None or r.get('status') in target_statuses)
+        and r.get('last_update', 0) >= cutoff_timestamp
+    ]
 
 
 def display_statistics(records: List[Dict]):
@@ -127,92 +222,106 @@ def display_statistics(records: List[Dict]):
     
     st.subheader("📊 统计概览")
     
+    # 一次遍历统计各状态数量
+    total = len(records)
+    counts = Counter(r.get('status') for r in records)
+    completed_count = counts['completed']
+    running_count = counts['running']
+    failed_count = counts['failed']
+    
     col1, col2, col3, col4 = st.columns(4)
     
     # 总记录数
     with col1:
-        st.metric("总记录数", len(records))
+        st.metric("总记录数", total)
     
     # 已完成数量
     with col2:
-        completed_count = len([r for r in records if r.get('status') == 'completed'])
-        st.metric("已完成", completed_count, f"{completed_count/len(records)*100:.1f}%")
+        st.metric("已完成", completed_count, f"{completed_count/total*100:.1f}%")
     
     # 运行中数量
     with col3:
-        running_count = len([r for r in records if r.get('status') == 'running'])
         st.metric("运行中", running_count)
     
     # 失败数量  
     with col4:
-        failed_count = len([r for r in records if r.get('status') == 'failed'])
-        st.metric("失败", failed_count, f"{failed_count/len(records)*100:.1f}%" if failed_count > 0 else "0%")
-
-
-def display_history_table(records: List[Dict]):
+        st.metric("失败", failed_count, f"{failed_count/total*100:.1f}%" if failed_count > 0 else "0%")
+
+
+def _records_fingerprint(records: List[Dict]) -> int:
+    """记录集合的指纹：分析ID和最后更新时间都未变化时，显示内容也不变"""
+    return hash(tuple((r.get('analysis_id', ''), r.get('last_update', 0)) for r in records))
+
+
+def _build_history_table(records: List[Dict]) -> pd.DataFrame:
+    """由记录列表构建DataFrame，只取需要的列并按列批量生成显示字段"""
+    df = pd.DataFrame.from_records(records, columns=list(_TABLE_COLUMNS))
+    df['analysts'] = df['analysts'].map(lambda analysts: ', '.join(analysts) if analysts else '未知')
+    df['research_depth'] = df['research_depth'].map(_DEPTH_MAP)
+    return df.fillna('未知').rename(columns=_TABLE_COLUMNS)
+
+
+def _build_markdown_table(records: List[Dict]) -> str:
+    """由记录列表拼接Markdown表格（用于少量记录）"""
+    def cell(value: Any) -> str:
+        return str(value).replace('|', '\\|')
+    
+    lines = [
+        "| " + " | ".join(_TABLE_COLUMNS.values()) + " |",
+        "|" + " --- |" * len(_TABLE_COLUMNS),
+    ]
+    for r in records:
+        analysts = r.get('analysts')
+        lines.append("| " + " | ".join(map(cell, (
+            r.get('stock_symbol') or '未知',
+            r.get('market_type') or '未知',
+            r['_status_display'],
+            r['_progress_display'],
+            r.get('start_time_formatted') or '未知',
+            r.get('duration_formatted') or '未知',
+            ', '.join(analysts) if analysts else '未知',
+            _DEPTH_MAP.get(r.get('research_depth'), '未知'),
+        ))) + " |")
+    return "\n".join(lines)
+
+
+def display_history_table(records: List[Dict], fingerprint: Optional[int] = None):
     """显示历史记录表格"""
     st.subheader("📋 历史记录列表")
     
-    # 准备表格数据
-    table_data = []
-    for record in records:
-        table_data.append({
-            "股票代码": record.get('stock_symbol', '未知'),
-            "市场": record.get('market_type', '未知'),
-            "状态": f"{record.get('status_icon', '❓')} {record.get('status_text', '未知')}",
-            "进度": f"{record.get('progress_percentage', 0):.1f}%",
-            "开始时间": record.get('start_time_formatted', '未知'),
-            "耗时": record.get('duration_formatted', '未知'),
-            "分析师": ', '.join(record.get('analysts', [])) if record.get('analysts') else '未知',
-            "研究深度": get_depth_text(record.get('research_depth')),
-            "操作": "action_buttons"  # 占位符，实际按钮在下面单独处理
-        })
-    
-    if not table_data:
+    if not records:
         st.info("📝 没有要显示的记录")
         return
     
-    # 创建DataFrame
-    df = pd.DataFrame(table_data)
-    
-    # 显示表格（不包含操作列）
-    display_df = df.drop('操作', axis=1)
-    
-    # 配置表格样式
-    styled_df = display_df.style.apply(style_status_row, axis=1)
+    # 记录较少时直接拼接Markdown表格，省去DataFrame构建和序列化
+    if len(records) <= _SMALL_TABLE_ROWS:
+        st.markdown(_build_markdown_table(records))
+        return
     
+    # 记录集合未变化时复用上次构建的表格
+    if fingerprint is None:
+        fingerprint = _records_fingerprint(records)
+    if st.session_state.get('_hist_table_fp') == fingerprint:
+        df = st.session_state['_hist_table']
+    else:
+        df = _build_history_table(records)
+        st.session_state['_hist_table_fp'] = fingerprint
+        st.session_state['_hist_table'] = df
+    
+    # 状态列已带图标，不再逐行生成Styler样式
     st.dataframe(
-        styled_df,
+        df,
         use_container_width=True,
         hide_index=True,
-        height=400
+        height=400,
+        column_config={
+            "状态": st.column_config.TextColumn("状态", help="✅ 已完成 / 🔄 运行中 / ❌ 失败"),
+            "进度": st.column_config.TextColumn("进度", width="small"),
+        }
     )
-    
-    st.markdown("---")
-    
-    # 显示操作按钮区域
-    display_action_buttons(records)
 
 
-def style_status_row(row):
-    """为表格行应用状态样式"""
-    styles = [''] * len(row)
-    
-    status_text = row['状态']
-    if '✅' in status_text:
-        # 已完成 - 绿色背景
-        styles = ['background-color: #d4edda'] * len(row)
-    elif '🔄' in status_text:
-        # 运行中 - 蓝色背景
-        styles = ['background-color: #d1ecf1'] * len(row)
-    elif '❌' in status_text:
-        # 失败 - 红色背景
-        styles = ['background-color: #f8d7da'] * len(row)
-    
-    return styles
-
-
-def display_action_buttons(records: List[Dict]):
+def display_action_buttons(records: List[Dict], fingerprint: Optional[int] = None):
     """显示操作按钮"""
     st.subheader("🔧 快速操作")
     
@@ -220,13 +329,15 @@ def display_action_buttons(records: List[Dict]):
     if not records:
         return
     
-    # 创建选择框选项
-    options = []
-    for i, record in enumerate(records):
-        stock = record.get('stock_symbol', '未知')
-        status = record.get('status_text', '未知')
-        time_str = record.get('last_update_formatted', '未知')
-        options.append(f"{stock} - {status} - {time_str}")
+    # 创建选择框选项，记录集合未变化时复用
+    if fingerprint is None:
+        fingerprint = _records_fingerprint(records)
+    if st.session_state.get('_hist_opts_fp') == fingerprint:
+        options = st.session_state['_hist_opts']
+    else:
+        options = [record['_option_label'] for record in records]
+        st.session_state['_hist_opts_fp'] = fingerprint
+        st.session_state['_hist_opts'] = options
     
     selected_index = st.selectbox(
         "选择要操作的记录",
@@ -248,30 +359,48 @@ def display_record_actions(record: Dict):
     
     st.markdown(f"**选中记录**: {record.get('stock_symbol')} ({record.get('status_text')})")
     
+    # 当前展开的面板记录在session state中，只有点击按钮后才读取详细数据，
+    # 无关控件引起的重跑不会重复加载，删除确认等多步操作也能在重跑后保留
+    panel_key = f"history_panel_{analysis_id}"
+    
     col1, col2, col3, col4 = st.columns(4)
     
+    # 只有点击查看报告按钮的那次运行才把报告写回主页面的session state
+    report_requested = False
+    
     # 查看详情
     with col1:
         if st.button("📊 查看详情", key=f"details_{analysis_id}"):
-            display_record_details(record)
+            st.session_state[panel_key] = 'details'
     
     # 查看报告（仅已完成的分析）
     with col2:
         if status == 'completed' and has_results:
             if st.button("📋 查看报告", key=f"report_{analysis_id}", type="primary"):
-                load_and_display_report(analysis_id)
+                st.session_state[panel_key] = 'report'
+                report_requested = True
         else:
             st.button("📋 查看报告", disabled=True, help="只有已完成的分析才能查看报告")
     
     # 重新分析
     with col3:
         if st.button("🔄 重新分析", key=f"rerun_{analysis_id}"):
-            setup_reanalysis(record)
+            st.session_state[panel_key] = 'reanalysis'
     
     # 删除记录
     with col4:
         if st.button("🗑️ 删除", key=f"delete_{analysis_id}"):
-            confirm_delete_record(analysis_id)
+            st.session_state[panel_key] = 'delete'
+    
+    panel = st.session_state.get(panel_key)
+    if panel == 'details':
+        display_record_details(record)
+    elif panel == 'report':
+        load_and_display_report(analysis_id, load_into_session=report_requested)
+    elif panel == 'reanalysis':
+        setup_reanalysis(record)
+    elif panel == 'delete':
+        confirm_delete_record(analysis_id)
 
 
 def display_record_details(record: Dict):
@@ -285,8 +414,8 @@ def display_record_details(record: Dict):
         st.markdown(f"**分析ID**: `{record.get('analysis_id')}`")
         st.markdown(f"**股票代码**: {record.get('stock_symbol')}")
         st.markdown(f"**市场类型**: {record.get('market_type')}")
-        st.markdown(f"**状态**: {record.get('status_icon')} {record.get('status_text')}")
-        st.markdown(f"**进度**: {record.get('progress_percentage', 0):.1f}%")
+        st.markdown(f"**状态**: {record['_status_display']}")
+        st.markdown(f"**进度**: {record['_progress_display']}")
     
     with col2:
         st.markdown(f"**开始时间**: {record.get('start_time_formatted')}")
@@ -298,7 +427,7 @@ def display_record_details(record: Dict):
     # 获取更详细的进度信息
     analysis_id = record.get('analysis_id')
     try:
-        progress_data = get_progress_by_id(analysis_id)
+        progress_data = _load_progress(analysis_id, record.get('status'))
         if progress_data:
             st.markdown("---")
             st.subheader("📈 详细进度")
@@ -323,13 +452,13 @@ def display_record_details(record: Dict):
         st.error(f"获取详细进度失败: {e}")
 
 
-def load_and_display_report(analysis_id: str):
-    """加载并显示分析报告"""
+def load_and_display_report(analysis_id: str, load_into_session: bool = False):
+    """加载并显示分析报告，load_into_session为True时同时把报告恢复到主页面"""
     try:
         st.subheader("📋 分析报告")
         
-        # 获取进度数据
-        progress_data = get_progress_by_id(analysis_id)
+        # 获取进度数据（只有已完成的分析才能查看报告）
+        progress_data = _load_progress(analysis_id, 'completed')
         if not progress_data:
             st.error("❌ 无法获取分析数据")
             return
@@ -345,12 +474,14 @@ def load_and_display_report(analysis_id: str):
             st.error("❌ 分析结果格式化失败")
             return
         
-        # 恢复到session state以便使用现有的显示组件
-        st.session_state.analysis_results = formatted_results
-        st.session_state.current_analysis_id = analysis_id
-        st.session_state.analysis_running = False
-        
-        st.success("✅ 报告已加载到主页面，请切换到「📊 股票分析」页面查看完整报告")
+        # 恢复到session state以便使用现有的显示组件；面板保持展开时的重跑只读显示，
+        # 不会覆盖用户之后在主页面发起的分析
+        if load_into_session:
+            st.session_state.analysis_results = formatted_results
+            st.session_state.current_analysis_id = analysis_id
+            st.session_state.analysis_running = False
+            
+            st.success("✅ 报告已加载到主页面，请切换到「📊 股票分析」页面查看完整报告")
         
         # 显示简要摘要
         if formatted_results.get('decision'):
@@ -371,7 +502,7 @@ def load_and_display_report(analysis_id: str):
     
     except Exception as e:
         st.error(f"❌ 加载报告失败: {e}")
-        logger.error(f"加载报告失败: {analysis_id}, 错误: {e}")
+        logger.error("加载报告失败: %s, 错误: %s", analysis_id, e)
 
 
 def setup_reanalysis(record: Dict):
@@ -425,70 +556,62 @@ def confirm_delete_record(analysis_id: str):
     
     with col2:
         if st.button("🚫 取消", type="primary"):
+            st.session_state.pop(f"history_panel_{analysis_id}", None)
             st.rerun()
 
 
 def delete_analysis_record(analysis_id: str):
     """删除分析记录"""
     try:
-        import os
-        import redis
-        
         success_count = 0
         error_messages = []
         
-        # 删除文件记录
+        # 删除文件记录（进度文件及其带时间戳的备份文件）
         try:
-            progress_file = f"./data/progress_{analysis_id}.json"
-            if os.path.exists(progress_file):
-                os.remove(progress_file)
+            data_dir = Path("./data")
+            removed_files = 0
+            # 备份文件名为 backup_progress_{分析ID}_{时间戳}.json；只接受纯数字后缀，
+            # 避免误删以「{分析ID}_」开头的其他分析的备份
+            backup_prefix = f"backup_progress_{analysis_id}_"
+            backup_files = [
+                path for path in data_dir.glob(f"{glob.escape(backup_prefix)}*.json")
+                if path.name[len(backup_prefix):-5].isdigit()
+            ]
+            for path in [data_dir / f"progress_{analysis_id}.json", *backup_files]:
+                try:
+                    path.unlink()
+                    removed_files += 1
+                except FileNotFoundError:
+                    pass
+            if removed_files > 0:
                 success_count += 1
-                logger.info(f"✅ 删除文件记录: {progress_file}")
+                logger.info("✅ 删除文件记录: %s, 共 %d 个文件", analysis_id, removed_files)
         except Exception as e:
             error_messages.append(f"文件删除失败: {e}")
         
-        # 删除Redis记录
+        # 删除Redis记录（进度数据、字段Hash和版本号）
         try:
-            redis_enabled = os.getenv('REDIS_ENABLED', 'false').lower() == 'true'
-            if redis_enabled:
-                redis_host = os.getenv('REDIS_HOST', 'localhost')
-                redis_port = int(os.getenv('REDIS_PORT', 6379))
-                redis_password = os.getenv('REDIS_PASSWORD', None)
-                redis_db = int(os.getenv('REDIS_DB', 0))
-
-                if redis_password:
-                    redis_client = redis.Redis(
-                        host=redis_host,
-                        port=redis_port,
-                        password=redis_password,
-                        db=redis_db,
-                        decode_responses=True
-                    )
-                else:
-                    redis_client = redis.Redis(
-                        host=redis_host,
-                        port=redis_port,
-                        db=redis_db,
-                        decode_responses=True
-                    )
-                
+            redis_client = _get_redis_client()
+            if redis_client is not None:
                 key = f"progress:{analysis_id}"
                 result = redis_client.delete(key)
                 if result > 0:
                     success_count += 1
-                    logger.info(f"✅ 删除Redis记录: {key}")
+                    logger.info("✅ 删除Redis记录: %s", key)
                 
         except Exception as e:
             error_messages.append(f"Redis删除失败: {e}")
         
         # 显示结果
         if success_count > 0:
-            st.success(f"✅ 成功删除 {success_count} 项记录")
-            if error_messages:
-                for msg in error_messages:
-                    st.warning(f"⚠️ {msg}")
+            logger.info("✅ 成功删除 %d 项记录: %s", success_count, analysis_id)
+            for msg in error_messages:
+                logger.warning("⚠️ 删除分析记录部分失败: %s, %s", analysis_id, msg)
             
-            # 自动刷新页面
+            # 清除历史记录缓存并自动刷新页面，删除结果在下一轮渲染中提示
+            st.session_state.pop(f"history_panel_{analysis_id}", None)
+            st.session_state['_hist_deleted_id'] = analysis_id
+            _cached_history.clear()
             st.rerun()
         else:
             st.error("❌ 删除失败，没有找到要删除的记录")
@@ -497,17 +620,12 @@ def delete_analysis_record(analysis_id: str):
     
     except Exception as e:
         st.error(f"❌ 删除操作失败: {e}")
-        logger.error(f"删除分析记录失败: {analysis_id}, 错误: {e}")
+        logger.error("删除分析记录失败: %s, 错误: %s", analysis_id, e)
 
 
 def get_depth_text(depth: Optional[int]) -> str:
     """获取研究深度的文本描述"""
-    depth_map = {
-        1: "快速分析",
-        2: "标准分析", 
-        3: "深度分析"
-    }
-    return depth_map.get(depth, "未知")
+    return _DEPTH_MAP.get(depth, "未知")
 
 
 if __name__ == "__main__":
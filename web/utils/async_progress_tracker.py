@@ -5,17 +5,36 @@
 """
 
 import json
+import re
 import time
 import os
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 import threading
-from pathlib import Path
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
 logger = get_logger('async_progress')
 
+# 进度数据在每次刷新时都要解析，安装了orjson时用它加速解码，否则使用标准库json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _loads(data):
+    """解析进度JSON；orjson不接受json.dumps写出的NaN/Infinity，此时退回标准库json"""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+# 常见股票代码格式（美股代码、A股6位代码、港股代码），用于从分析ID中提取股票代码
+_STOCK_SYMBOL_RE = re.compile(r'([A-Z]{1,5}|\d{6}|\d{3,4}\.HK)')
+
 def safe_serialize(obj):
     """安全序列化对象，处理不可序列化的类型"""
     if hasattr(obj, 'dict'):
@@ -43,8 +62,45 @@ def safe_serialize(obj):
         except (TypeError, ValueError):
             return str(obj)  # 转换为字符串
 
+def _write_json_atomic(path: str, data: Any):
+    """先写临时文件再原子替换，读取方永远不会看到写了一半的JSON"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+# 共享的Redis连接池（进程内复用socket，避免每次读写都重新建立连接）；
+# 连接用尽时阻塞等待空闲连接，而不是直接抛出ConnectionError
+_redis_pool = None
+_redis_pool_lock = threading.Lock()
+
+def get_redis_client():
+    """获取使用共享连接池的Redis客户端"""
+    global _redis_pool
+    import redis
+
+    if _redis_pool is None:
+        with _redis_pool_lock:
+            if _redis_pool is None:
+                # 从环境变量获取Redis配置
+                _redis_pool = redis.BlockingConnectionPool(
+                    host=os.getenv('REDIS_HOST', 'localhost'),
+                    port=int(os.getenv('REDIS_PORT', 6379)),
+                    password=os.getenv('REDIS_PASSWORD', None) or None,
+                    db=int(os.getenv('REDIS_DB', 0)),
+                    max_connections=16,
+                    timeout=int(os.getenv('REDIS_POOL_TIMEOUT', 5)),
+                    socket_keepalive=True,
+                    health_check_interval=30,
+                    decode_responses=True
+                )
+    return redis.Redis(connection_pool=_redis_pool)
+
 class AsyncProgressTracker:
     """异步进度跟踪器"""
+
+    # 进度写入的最小间隔（秒），间隔内的多次更新合并为一次写入
+    SAVE_INTERVAL = 0.5
     
     def __init__(self, analysis_id: str, analysts: List[str], research_depth: int, llm_provider: str):
         self.analysis_id = analysis_id
@@ -73,9 +129,15 @@ class AsyncProgressTracker:
             'last_message': '准备开始分析...',
             'last_update': time.time(),
             'start_time': self.start_time,
+            'research_depth': self.research_depth,
             'steps': self.analysis_steps
         }
         
+        # 合并写入：待执行的定时写入，以及串行化写入的锁
+        self._save_timer = None
+        self._save_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
         # 尝试初始化Redis，失败则使用文件
         self.redis_client = None
         self.use_redis = self._init_redis()
@@ -93,7 +155,6 @@ class AsyncProgressTracker:
         # 注册到日志系统进行自动进度更新
         try:
             from .progress_log_handler import register_analysis_tracker
-            import threading
 
             # 使用超时机制避免死锁
             def register_with_timeout():
@@ -128,34 +189,12 @@ class AsyncProgressTracker:
                 logger.info(f"📊 [异步进度] Redis已禁用，使用文件存储")
                 return False
 
-            import redis
-
-            # 从环境变量获取Redis配置
-            redis_host = os.getenv('REDIS_HOST', 'localhost')
-            redis_port = int(os.getenv('REDIS_PORT', 6379))
-            redis_password = os.getenv('REDIS_PASSWORD', None)
-            redis_db = int(os.getenv('REDIS_DB', 0))
-
-            # 创建Redis连接
-            if redis_password:
-                self.redis_client = redis.Redis(
-                    host=redis_host,
-                    port=redis_port,
-                    password=redis_password,
-                    db=redis_db,
-                    decode_responses=True
-                )
-            else:
-                self.redis_client = redis.Redis(
-                    host=redis_host,
-                    port=redis_port,
-                    db=redis_db,
-                    decode_responses=True
-                )
+            self.redis_client = get_redis_client()
 
             # 测试连接
             self.redis_client.ping()
-            logger.info(f"📊 [异步进度] Redis连接成功: {redis_host}:{redis_port}")
+            conn_kwargs = self.redis_client.connection_pool.connection_kwargs
+            logger.info(f"📊 [异步进度] Redis连接成功: {conn_kwargs.get('host')}:{conn_kwargs.get('port')}")
             return True
         except Exception as e:
             logger.warning(f"📊 [异步进度] Redis连接失败，使用文件存储: {e}")
@@ -357,8 +396,8 @@ class AsyncProgressTracker:
             'status': 'completed' if progress_percentage >= 100 else 'running'
         })
 
-        # 保存到存储
-        self._save_progress()
+        # 保存到存储（合并短时间内的多次更新）
+        self._schedule_save()
 
         # 详细的更新日志
         step_name = current_step_info.get('name', '未知')
@@ -485,8 +524,35 @@ class AsyncProgressTracker:
 
         return remaining
     
+    def _schedule_save(self):
+        """安排一次延迟写入，SAVE_INTERVAL内的后续更新复用同一次写入"""
+        with self._save_lock:
+            if self._save_timer is not None:
+                return
+            self._save_timer = threading.Timer(self.SAVE_INTERVAL, self._flush_scheduled_save)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def _flush_scheduled_save(self):
+        """定时器回调：写入最新的进度状态"""
+        with self._save_lock:
+            self._save_timer = None
+        self._save_progress()
+
+    def _cancel_scheduled_save(self):
+        """取消待执行的延迟写入（随后会立即写入）"""
+        with self._save_lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+
     def _save_progress(self):
         """保存进度到存储"""
+        with self._write_lock:
+            self._write_progress()
+
+    def _write_progress(self):
+        """将当前进度写入Redis或文件"""
         try:
             current_step_name = self.progress_data.get('current_step_name', '未知')
             progress_pct = self.progress_data.get('progress_percentage', 0)
@@ -507,8 +573,7 @@ class AsyncProgressTracker:
                 safe_data = safe_serialize(self.progress_data)
                 # 确保目录存在
                 os.makedirs(os.path.dirname(self.progress_file), exist_ok=True)
-                with open(self.progress_file, 'w', encoding='utf-8') as f:
-                    json.dump(safe_data, f, ensure_ascii=False, indent=2)
+                _write_json_atomic(self.progress_file, safe_data)
                 
                 # 额外保存一份带时间戳的备份文件
                 backup_file = f"./data/backup_progress_{self.analysis_id}_{int(time.time())}.json"
@@ -529,12 +594,11 @@ class AsyncProgressTracker:
                 if self.use_redis:
                     # Redis失败，尝试文件存储
                     logger.warning(f"📊 [异步进度] Redis保存失败，尝试文件存储")
-                    backup_file = f"./data/progress_{self.analysis_id}.json"
-                    os.makedirs(os.path.dirname(backup_file), exist_ok=True)
+                    fallback_file = f"./data/progress_{self.analysis_id}.json"
+                    os.makedirs(os.path.dirname(fallback_file), exist_ok=True)
                     safe_data = safe_serialize(self.progress_data)
-                    with open(backup_file, 'w', encoding='utf-8') as f:
-                        json.dump(safe_data, f, ensure_ascii=False, indent=2)
-                    logger.info(f"📊 [备用存储] 文件保存成功: {backup_file}")
+                    _write_json_atomic(fallback_file, safe_data)
+                    logger.info(f"📊 [备用存储] 文件保存成功: {fallback_file}")
                 else:
                     # 文件存储失败，尝试简化数据
                     logger.warning(f"📊 [异步进度] 文件保存失败，尝试简化数据")
@@ -545,10 +609,9 @@ class AsyncProgressTracker:
                         'last_message': str(self.progress_data.get('last_message', '')),
                         'last_update': self.progress_data.get('last_update', time.time())
                     }
-                    backup_file = f"./data/progress_{self.analysis_id}.json"
-                    with open(backup_file, 'w', encoding='utf-8') as f:
-                        json.dump(simplified_data, f, ensure_ascii=False, indent=2)
-                    logger.info(f"📊 [备用存储] 简化数据保存成功: {backup_file}")
+                    fallback_file = f"./data/progress_{self.analysis_id}.json"
+                    _write_json_atomic(fallback_file, simplified_data)
+                    logger.info(f"📊 [备用存储] 简化数据保存成功: {fallback_file}")
             except Exception as backup_e:
                 logger.error(f"📊 [异步进度] 备用存储也失败: {backup_e}")
     
@@ -577,6 +640,8 @@ class AsyncProgressTracker:
                 logger.warning(f"📊 [异步进度] 结果序列化失败: {e}")
                 self.progress_data['raw_results'] = str(results)  # 最后的fallback
 
+        # 完成状态立即写入，不等待定时器
+        self._cancel_scheduled_save()
         self._save_progress()
         logger.info(f"📊 [异步进度] 分析完成: {self.analysis_id}")
 
@@ -592,6 +657,8 @@ class AsyncProgressTracker:
         self.progress_data['status'] = 'failed'
         self.progress_data['last_message'] = f"分析失败: {error_message}"
         self.progress_data['last_update'] = time.time()
+        # 失败状态立即写入，不等待定时器
+        self._cancel_scheduled_save()
         self._save_progress()
         logger.error(f"📊 [异步进度] 分析失败: {self.analysis_id}, 错误: {error_message}")
 
@@ -611,49 +678,47 @@ def get_progress_by_id(analysis_id: str) -> Optional[Dict[str, Any]]:
         # 如果Redis启用，先尝试Redis
         if redis_enabled:
             try:
-                import redis
-
-                # 从环境变量获取Redis配置
-                redis_host = os.getenv('REDIS_HOST', 'localhost')
-                redis_port = int(os.getenv('REDIS_PORT', 6379))
-                redis_password = os.getenv('REDIS_PASSWORD', None)
-                redis_db = int(os.getenv('REDIS_DB', 0))
-
-                # 创建Redis连接
-                if redis_password:
-                    redis_client = redis.Redis(
-                        host=redis_host,
-                        port=redis_port,
-                        password=redis_password,
-                        db=redis_db,
-                        decode_responses=True
-                    )
-                else:
-                    redis_client = redis.Redis(
-                        host=redis_host,
-                        port=redis_port,
-                        db=redis_db,
-                        decode_responses=True
-                    )
+                redis_client = get_redis_client()
 
                 key = f"progress:{analysis_id}"
                 data = redis_client.get(key)
                 if data:
-                    return json.loads(data)
+                    return _loads(data)
             except Exception as e:
                 logger.debug(f"📊 [异步进度] Redis读取失败: {e}")
 
         # 尝试文件
         progress_file = f"./data/progress_{analysis_id}.json"
         if os.path.exists(progress_file):
-            with open(progress_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            with open(progress_file, 'rb') as f:
+                return _loads(f.read())
 
         return None
     except Exception as e:
         logger.error(f"📊 [异步进度] 获取进度失败: {analysis_id}, 错误: {e}")
         return None
 
+def _mget_chunked(redis_client, keys: List[str], chunk_size: int = 500) -> List[Optional[str]]:
+    """分块MGET批量读取，每块一条命令，避免单个超大回复"""
+    pipe = redis_client.pipeline(transaction=False)
+    for i in range(0, len(keys), chunk_size):
+        pipe.mget(keys[i:i + chunk_size])
+    values = []
+    for chunk_values in pipe.execute():
+        values.extend(chunk_values)
+    return values
+
+def _iter_progress_files(data_dir: str = "./data"):
+    """遍历数据目录中的 progress_*.json 文件，返回 os.DirEntry（只读取一次目录）"""
+    try:
+        with os.scandir(data_dir) as it:
+            for entry in it:
+                name = entry.name
+                if name.startswith("progress_") and name.endswith(".json") and entry.is_file():
+                    yield entry
+    except FileNotFoundError:
+        return
+
 def format_time(seconds: float) -> str:
     """格式化时间显示"""
     if seconds < 60:
@@ -675,45 +740,23 @@ def get_latest_analysis_id() -> Optional[str]:
         # 如果Redis启用，先尝试从Redis获取
         if redis_enabled:
             try:
-                import redis
+                redis_client = get_redis_client()
 
-                # 从环境变量获取Redis配置
-                redis_host = os.getenv('REDIS_HOST', 'localhost')
-                redis_port = int(os.getenv('REDIS_PORT', 6379))
-                redis_password = os.getenv('REDIS_PASSWORD', None)
-                redis_db = int(os.getenv('REDIS_DB', 0))
-
-                # 创建Redis连接
-                if redis_password:
-                    redis_client = redis.Redis(
-                        host=redis_host,
-                        port=redis_port,
-                        password=redis_password,
-                        db=redis_db,
-                        decode_responses=True
-                    )
-                else:
-                    redis_client = redis.Redis(
-                        host=redis_host,
-                        port=redis_port,
-                        db=redis_db,
-                        decode_responses=True
-                    )
-
-                # 获取所有progress键
-                keys = redis_client.keys("progress:*")
+                # 获取所有progress键（SCAN游标迭代，避免KEYS阻塞Redis）
+                keys = list(redis_client.scan_iter(match="progress:*", count=1000))
                 if not keys:
                     return None
 
-                # 获取每个键的数据，找到最新的
+                # 分块MGET批量获取每个键的数据，找到最新的
+                values = _mget_chunked(redis_client, keys)
+
                 latest_time = 0
                 latest_id = None
 
-                for key in keys:
+                for key, data in zip(keys, values):
                     try:
-                        data = redis_client.get(key)
                         if data:
-                            progress_data = json.loads(data)
+                            progress_data = _loads(data)
                             last_update = progress_data.get('last_update', 0)
                             if last_update > latest_time:
                                 latest_time = last_update
@@ -730,18 +773,13 @@ def get_latest_analysis_id() -> Optional[str]:
                 logger.debug(f"📊 [恢复分析] Redis查找失败: {e}")
 
         # 如果Redis失败或未启用，尝试从文件查找
-        data_dir = Path("data")
-        if data_dir.exists():
-            progress_files = list(data_dir.glob("progress_*.json"))
-            if progress_files:
-                # 按修改时间排序，获取最新的
-                latest_file = max(progress_files, key=lambda f: f.stat().st_mtime)
-                # 从文件名提取analysis_id
-                filename = latest_file.name
-                if filename.startswith("progress_") and filename.endswith(".json"):
-                    analysis_id = filename[9:-5]  # 去掉前缀和后缀
-                    logger.debug(f"📊 [恢复分析] 从文件找到最新分析ID: {analysis_id}")
-                    return analysis_id
+        # 按修改时间获取最新的文件
+        latest_file = max(_iter_progress_files("data"), key=lambda e: e.stat().st_mtime, default=None)
+        if latest_file is not None:
+            # 从文件名提取analysis_id
+            analysis_id = latest_file.name[9:-5]  # 去掉前缀和后缀
+            logger.debug(f"📊 [恢复分析] 从文件找到最新分析ID: {analysis_id}")
+            return analysis_id
 
         return None
     except Exception as e:
@@ -760,39 +798,18 @@ def get_all_analysis_history(limit: int = 50) -> List[Dict[str, Any]]:
         # 如果Redis启用，先从Redis获取
         if redis_enabled:
             try:
-                import redis
+                redis_client = get_redis_client()
 
-                # 从环境变量获取Redis配置
-                redis_host = os.getenv('REDIS_HOST', 'localhost')
-                redis_port = int(os.getenv('REDIS_PORT', 6379))
-                redis_password = os.getenv('REDIS_PASSWORD', None)
-                redis_db = int(os.getenv('REDIS_DB', 0))
-
-                # 创建Redis连接
-                if redis_password:
-                    redis_client = redis.Redis(
-                        host=redis_host,
-                        port=redis_port,
-                        password=redis_password,
-                        db=redis_db,
-                        decode_responses=True
-                    )
-                else:
-                    redis_client = redis.Redis(
-                        host=redis_host,
-                        port=redis_port,
-                        db=redis_db,
-                        decode_responses=True
-                    )
-
-                # 获取所有progress键
-                keys = redis_client.keys("progress:*")
-                
-                for key in keys:
+                # 获取所有progress键（SCAN游标迭代，避免KEYS阻塞Redis）
+                keys = list(redis_client.scan_iter(match="progress:*", count=1000))
+
+                # 分块MGET批量获取，避免每个键一次网络往返
+                values = _mget_chunked(redis_client, keys)
+
+                for key, data in zip(keys, values):
                     try:
-                        data = redis_client.get(key)
                         if data:
-                            progress_data = json.loads(data)
+                            progress_data = _loads(data)
                             # 从键名中提取analysis_id
                             analysis_id = key.replace('progress:', '')
                             
@@ -811,33 +828,31 @@ def get_all_analysis_history(limit: int = 50) -> List[Dict[str, Any]]:
 
         # 从文件获取记录（补充或作为主要数据源）
         try:
-            import glob
-            
-            data_dir = "./data"
-            if os.path.exists(data_dir):
-                progress_files = glob.glob(os.path.join(data_dir, "progress_*.json"))
-                
-                for file_path in progress_files:
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            progress_data = json.load(f)
-                        
-                        # 从文件名提取analysis_id
-                        filename = os.path.basename(file_path)
-                        analysis_id = filename.replace('progress_', '').replace('.json', '')
-                        
-                        # 避免重复（如果已经从Redis获取过）
-                        existing_ids = {record['analysis_id'] for record in history_records}
-                        if analysis_id not in existing_ids:
-                            record = extract_analysis_summary(progress_data, analysis_id)
-                            if record:
-                                history_records.append(record)
-                                
-                    except Exception as e:
-                        logger.debug(f"📊 [历史记录] 文件解析失败: {file_path}, 错误: {e}")
+            # 避免重复（如果已经从Redis获取过）
+            existing_ids = {record['analysis_id'] for record in history_records}
+            file_record_count = 0
+
+            for entry in _iter_progress_files("./data"):
+                try:
+                    # 从文件名提取analysis_id
+                    analysis_id = entry.name[9:-5]
+                    if analysis_id in existing_ids:
                         continue
 
-                logger.info(f"📊 [历史记录] 从文件获取到额外 {len(history_records) - len([r for r in history_records if 'source' in r and r['source'] == 'redis'])} 条记录")
+                    with open(entry.path, 'rb') as f:
+                        progress_data = _loads(f.read())
+
+                    record = extract_analysis_summary(progress_data, analysis_id)
+                    if record:
+                        history_records.append(record)
+                        existing_ids.add(analysis_id)
+                        file_record_count += 1
+
+                except Exception as e:
+                    logger.debug(f"📊 [历史记录] 文件解析失败: {entry.path}, 错误: {e}")
+                    continue
+
+            logger.info(f"📊 [历史记录] 从文件获取到额外 {file_record_count} 条记录")
 
         except Exception as e:
             logger.debug(f"📊 [历史记录] 文件获取失败: {e}")
@@ -870,7 +885,7 @@ def extract_analysis_summary(progress_data: Dict[str, Any], analysis_id: str) ->
         stock_symbol = None
         market_type = None
         analysts = []
-        research_depth = None
+        research_depth = progress_data.get('research_depth')
         
         # 从raw_results获取股票信息
         raw_results = progress_data.get('raw_results', {})
@@ -878,15 +893,12 @@ def extract_analysis_summary(progress_data: Dict[str, Any], analysis_id: str) ->
             stock_symbol = raw_results.get('stock_symbol')
             market_type = raw_results.get('market_type', '未知')
             analysts = raw_results.get('analysts', [])
-            research_depth = raw_results.get('research_depth')
+            research_depth = raw_results.get('research_depth', research_depth)
         
         # 如果raw_results中没有，尝试从分析ID中提取
         if not stock_symbol and analysis_id:
             # 分析ID格式通常包含股票代码，尝试提取
-            import re
-            # 匹配常见股票代码格式
-            stock_pattern = r'([A-Z]{1,5}|\d{6}|\d{3,4}\.HK)'
-            match = re.search(stock_pattern, analysis_id.upper())
+            match = _STOCK_SYMBOL_RE.search(analysis_id.upper())
             if match:
                 stock_symbol = match.group(1)
         
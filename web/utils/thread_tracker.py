@@ -3,21 +3,131 @@
 用于跟踪和检测分析线程的存活状态
 """
 
+import os
+import queue
 import threading
 import time
-from typing import Dict, Optional
+from concurrent.futures import Future
+from typing import Dict, Optional, Tuple, Union
 from tradingagents.utils.logging_manager import get_logger
 
 logger = get_logger('web')
 
+# 分析任务句柄：独立线程或线程池中的Future
+AnalysisHandle = Union[threading.Thread, Future]
+
+def _get_analysis_workers(default: int = 4) -> int:
+    """读取ANALYSIS_WORKERS配置，无效值时回退到默认并发数"""
+    value = os.getenv('ANALYSIS_WORKERS', str(default))
+    try:
+        workers = int(value)
+    except ValueError:
+        logger.warning(f"⚠️ [线程跟踪] ANALYSIS_WORKERS配置无效: {value}，使用默认值 {default}")
+        return default
+    if workers < 1:
+        logger.warning(f"⚠️ [线程跟踪] ANALYSIS_WORKERS必须大于0: {value}，使用默认值 {default}")
+        return default
+    return workers
+
+class AnalysisCancelledError(Exception):
+    """用户停止了正在运行的分析"""
+
+class _AnalysisPool:
+    """
+    共享的分析线程池：最多max_workers个工作线程，超出的任务排队等待
+    工作线程为守护线程，Ctrl-C退出时不会等待未完成的分析
+    """
+
+    def __init__(self, max_workers: int):
+        self._max_workers = max_workers
+        self._queue = queue.SimpleQueue()
+        self._workers = []
+        # 空闲工作线程计数，与ThreadPoolExecutor相同：有空闲线程时不新建线程
+        self._idle = threading.Semaphore(0)
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, **kwargs) -> Tuple[Future, bool]:
+        """提交任务，返回(Future, 是否需要排队)；所有工作线程都在忙时任务进入队列"""
+        future = Future()
+        with self._lock:
+            self._queue.put((future, fn, args, kwargs))
+            if self._idle.acquire(blocking=False):
+                return future, False
+            if len(self._workers) < self._max_workers:
+                worker = threading.Thread(
+                    target=self._worker,
+                    name=f"Analysis_{len(self._workers)}",
+                    daemon=True
+                )
+                self._workers.append(worker)
+                worker.start()
+                return future, False
+        return future, True
+
+    def _worker(self):
+        while True:
+            future, fn, args, kwargs = self._queue.get()
+            # 排队期间已被取消的任务直接跳过
+            if future.set_running_or_notify_cancel():
+                try:
+                    result = fn(*args, **kwargs)
+                except BaseException as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+            self._idle.release()
+
+_analysis_pool = _AnalysisPool(_get_analysis_workers())
+
+# 用户请求停止的运行中分析，由分析的进度回调检查后中止
+_cancel_requested = set()
+_cancel_lock = threading.Lock()
+
+def _on_analysis_done(analysis_id: str, future: Future):
+    """分析任务结束时清理停止标记，并记录未被捕获的异常"""
+    with _cancel_lock:
+        _cancel_requested.discard(analysis_id)
+    if future.cancelled():
+        return
+    error = future.exception()
+    if isinstance(error, AnalysisCancelledError):
+        logger.info(f"⏹️ [线程跟踪] 分析已停止: {analysis_id}")
+    elif error is not None:
+        logger.error(f"❌ [线程跟踪] 分析任务异常退出: {analysis_id}, 错误: {error}",
+                     exc_info=(type(error), error, error.__traceback__))
+
+def _handle_alive(handle: AnalysisHandle) -> bool:
+    """检查分析任务是否仍在运行（排队中的Future也视为运行中）"""
+    if isinstance(handle, Future):
+        return not handle.done()
+    return handle.is_alive()
+
+def _handle_info(analysis_id: str, handle: AnalysisHandle) -> Dict:
+    """构建分析任务的信息字典"""
+    if isinstance(handle, Future):
+        return {
+            'analysis_id': analysis_id,
+            'thread_name': f"Analysis-{analysis_id}",
+            'thread_id': None,
+            'is_alive': not handle.done(),
+            'is_daemon': True
+        }
+    return {
+        'analysis_id': analysis_id,
+        'thread_name': handle.name,
+        'thread_id': handle.ident,
+        'is_alive': handle.is_alive(),
+        'is_daemon': handle.daemon
+    }
+
 class ThreadTracker:
     """线程跟踪器"""
     
     def __init__(self):
-        self._threads: Dict[str, threading.Thread] = {}
+        self._threads: Dict[str, AnalysisHandle] = {}
         self._lock = threading.Lock()
     
-    def register_thread(self, analysis_id: str, thread: threading.Thread):
+    def register_thread(self, analysis_id: str, thread: AnalysisHandle):
         """注册分析线程"""
         with self._lock:
             self._threads[analysis_id] = thread
@@ -37,7 +147,7 @@ class ThreadTracker:
             if thread is None:
                 return False
             
-            is_alive = thread.is_alive()
+            is_alive = _handle_alive(thread)
             if not is_alive:
                 # 线程已死亡，自动清理
                 del self._threads[analysis_id]
@@ -45,14 +155,14 @@ class ThreadTracker:
             
             return is_alive
     
-    def get_alive_threads(self) -> Dict[str, threading.Thread]:
+    def get_alive_threads(self) -> Dict[str, AnalysisHandle]:
         """获取所有存活的线程"""
         with self._lock:
             alive_threads = {}
             dead_threads = []
             
             for analysis_id, thread in self._threads.items():
-                if thread.is_alive():
+                if _handle_alive(thread):
                     alive_threads[analysis_id] = thread
                 else:
                     dead_threads.append(analysis_id)
@@ -64,6 +174,22 @@ class ThreadTracker:
             
             return alive_threads
     
+    def is_queued(self, analysis_id: str) -> bool:
+        """检查分析任务是否仍在排队等待空闲线程"""
+        with self._lock:
+            handle = self._threads.get(analysis_id)
+            return isinstance(handle, Future) and not handle.running() and not handle.done()
+    
+    def cancel(self, analysis_id: str) -> bool:
+        """取消尚未开始执行的分析任务，返回是否取消成功"""
+        with self._lock:
+            handle = self._threads.get(analysis_id)
+            if isinstance(handle, Future) and handle.cancel():
+                del self._threads[analysis_id]
+                logger.info(f"📊 [线程跟踪] 取消排队中的分析任务: {analysis_id}")
+                return True
+            return False
+    
     def cleanup_dead_threads(self):
         """清理所有死亡线程"""
         self.get_alive_threads()  # 这会自动清理死亡线程
@@ -75,35 +201,54 @@ class ThreadTracker:
             if thread is None:
                 return None
             
-            return {
-                'analysis_id': analysis_id,
-                'thread_name': thread.name,
-                'thread_id': thread.ident,
-                'is_alive': thread.is_alive(),
-                'is_daemon': thread.daemon
-            }
+            return _handle_info(analysis_id, thread)
     
     def get_all_thread_info(self) -> Dict[str, Dict]:
         """获取所有线程信息"""
         with self._lock:
             info = {}
             for analysis_id, thread in self._threads.items():
-                info[analysis_id] = {
-                    'analysis_id': analysis_id,
-                    'thread_name': thread.name,
-                    'thread_id': thread.ident,
-                    'is_alive': thread.is_alive(),
-                    'is_daemon': thread.daemon
-                }
+                info[analysis_id] = _handle_info(analysis_id, thread)
             return info
 
 # 全局线程跟踪器实例
 thread_tracker = ThreadTracker()
 
-def register_analysis_thread(analysis_id: str, thread: threading.Thread):
+def register_analysis_thread(analysis_id: str, thread: AnalysisHandle):
     """注册分析线程"""
     thread_tracker.register_thread(analysis_id, thread)
 
+def submit_analysis(analysis_id: str, fn, *args, **kwargs) -> Future:
+    """提交分析任务到共享线程池并注册跟踪，超出并发上限的任务排队等待"""
+    future, queued = _analysis_pool.submit(fn, *args, **kwargs)
+    thread_tracker.register_thread(analysis_id, future)
+    future.add_done_callback(lambda f: _on_analysis_done(analysis_id, f))
+    if queued:
+        logger.info(f"⏳ [线程跟踪] 分析线程已满，任务排队中: {analysis_id}")
+    return future
+
+def cancel_analysis(analysis_id: str) -> bool:
+    """
+    停止分析任务：排队中的任务直接取消并返回True；
+    运行中的任务记录停止请求，由分析的进度回调在下一次更新时中止，返回False
+    """
+    if thread_tracker.cancel(analysis_id):
+        return True
+    if thread_tracker.is_thread_alive(analysis_id):
+        with _cancel_lock:
+            _cancel_requested.add(analysis_id)
+        logger.info(f"⏹️ [线程跟踪] 已请求停止运行中的分析: {analysis_id}")
+    return False
+
+def is_analysis_cancelled(analysis_id: str) -> bool:
+    """检查用户是否请求停止该分析"""
+    with _cancel_lock:
+        return analysis_id in _cancel_requested
+
+def is_analysis_queued(analysis_id: str) -> bool:
+    """检查分析任务是否仍在排队等待空闲线程"""
+    return thread_tracker.is_queued(analysis_id)
+
 def unregister_analysis_thread(analysis_id: str):
     """注销分析线程"""
     thread_tracker.unregister_thread(analysis_id)